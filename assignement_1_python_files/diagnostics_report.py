@@ -0,0 +1,10 @@
+from project_models import fit_project_models
+from model_diagnostics import diagnostics_table, write_diagnostics, DEFAULT_OUTPUT
+
+# Gemeinsame Vergleichstabelle aller Modelle des Projekts (statt summary() je Modell).
+# Schätzt nur die Modelle aus project_models.py, ohne Plots und ohne die übrigen
+# Abschnitte der Skripte. Ausführen aus dem Projektverzeichnis (Pfade zu data_assignement_1).
+
+diagnostics = diagnostics_table(fit_project_models())
+print(diagnostics)
+print(f"Vergleichstabelle gespeichert: {write_diagnostics(diagnostics, DEFAULT_OUTPUT)}")
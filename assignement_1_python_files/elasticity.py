@@ -3,6 +3,7 @@ import pandas as pd
 import statsmodels.api as sm
 import matplotlib.pyplot as plt
 from statsmodels.tsa.stattools import adfuller
+from robust_inference import robust_results
 
 def read_hourly_prices(csv_file_path):
     """
@@ -140,7 +141,7 @@ log_load = np.log(df_filtered["Value_ScaleTo100"])
 X = sm.add_constant(log_price)  # Fügt den Intercept (log(C)) hinzu
 y = log_load
 
-model = sm.OLS(y, X).fit()
+model = robust_results(sm.OLS(y, X).fit(), maxlags=168)  # HAC-Standardfehler
 print(model.summary())
 electricity_demand_elasticity = model.params['AT']
 print('')
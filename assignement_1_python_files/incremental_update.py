@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+
+
+# Rohspalten, die jede neue Stunde mitbringen muss (siehe prepare_combined_data)
+RAW_COLUMNS = [
+    "Strompreis",
+    "Nachfrage",
+    "Temperatur",
+    "Stromexport",
+    "Stromimport",
+    "Stromerzeugung",
+    "Stromerzeugung_ern",
+]
+
+# Lag-Features wie in price_model.py und power_demand_model.py
+LAG_FEATURES = {
+    "Nachfrage_lag1": ("Nachfrage", 1),
+    "Strompreis_lag1": ("Strompreis", 1),
+    "Strompreis_lag24": ("Strompreis", 24),
+    "Strompreis_lag168": ("Strompreis", 168),
+}
+
+# Anzahl der Stunden, die für die Lag-Features aufbewahrt werden müssen
+HISTORY_WINDOW = max(lag for _, lag in LAG_FEATURES.values())
+
+
+def _check_index(history_tail, new_rows):
+    """
+    Prüft, dass der Index der neuen Stunden lückenlos an die Historie anschließt.
+
+    Bei einem Ganzzahl-Index (wie aus prepare_combined_data) müssen die neuen Zeilen
+    mit dem nächsten Index beginnen, bei einem DatetimeIndex eine Stunde nach dem
+    letzten Zeitstempel. Bereits vorhandene oder doppelt gesendete Stunden fallen so auf.
+
+    :param history_tail: DataFrame mit den letzten Stunden der bestehenden Daten
+    :param new_rows: DataFrame mit den neuen Stunden
+    :return: None, wirft ValueError bei Überschneidung oder Lücke
+    """
+    overlap = history_tail.index.intersection(new_rows.index)
+    if len(overlap) > 0:
+        raise ValueError(f"{len(overlap)} der neuen Stunden sind bereits in den bestehenden Daten enthalten.")
+    if new_rows.index.has_duplicates:
+        raise ValueError("Die neuen Daten enthalten doppelte Stunden.")
+
+    last = history_tail.index[-1]
+    if isinstance(new_rows.index, pd.DatetimeIndex):
+        expected = pd.date_range(last + pd.Timedelta(hours=1), periods=len(new_rows), freq="h")
+    elif pd.api.types.is_integer_dtype(new_rows.index) and pd.api.types.is_integer_dtype(history_tail.index):
+        expected = last + 1 + np.arange(len(new_rows))
+    else:
+        return
+    if not np.array_equal(new_rows.index.to_numpy(), np.asarray(expected)):
+        raise ValueError(
+            f"Der Index der neuen Daten schließt nicht an die bestehenden Daten an (erwartet ab {expected[0]}, "
+            f"erhalten ab {new_rows.index[0]})."
+        )
+
+
+def validate_new_rows(history_tail, new_rows):
+    """
+    Prüft neue Stunden gegen das Ende der bestehenden Daten.
+
+    Geprüft werden Rohspalten, fehlende Werte, der Anschluss des Index (keine
+    Überschneidung, keine Lücke) und die fortlaufende Tageszeit.
+
+    :param history_tail: DataFrame mit den letzten Stunden der bestehenden Daten
+    :param new_rows: DataFrame mit den neuen Stunden (Rohspalten und Tageszeit)
+    :return: None, wirft ValueError bei ungültigen Daten
+    """
+    missing = [column for column in RAW_COLUMNS + ["Tageszeit"] if column not in new_rows.columns]
+    if missing:
+        raise ValueError(f"Den neuen Daten fehlen die Spalten {missing}.")
+
+    if new_rows[RAW_COLUMNS + ["Tageszeit"]].isna().any().any():
+        raise ValueError("Die neuen Daten enthalten fehlende Werte.")
+
+    if len(history_tail) == 0:
+        raise ValueError("Es wird mindestens eine Stunde Historie benötigt.")
+
+    _check_index(history_tail, new_rows)
+
+    # Die Tageszeit muss an die Historie anschließen
+    expected = (history_tail["Tageszeit"].iloc[-1] + 1 + np.arange(len(new_rows))) % 24
+    if not np.array_equal(new_rows["Tageszeit"].to_numpy(), expected):
+        raise ValueError("Die Tageszeit der neuen Daten schließt nicht an die bestehenden Daten an.")
+
+
+def append_new_hours(history_tail, new_rows, window=HISTORY_WINDOW):
+    """
+    Berechnet die abgeleiteten Features nur für die neuen Stunden.
+
+    Statt prepare_combined_data und alle Lags neu zu berechnen, werden nur die
+    neuen Zeilen zusammen mit einem Fenster der letzten Stunden verarbeitet.
+    Der Aufwand hängt damit nur von der Anzahl neuer Stunden ab.
+
+    :param history_tail: DataFrame mit mindestens den letzten `window` Stunden (inkl. Tageszeit)
+    :param new_rows: DataFrame mit den neuen Stunden (Rohspalten und Tageszeit), Index fortlaufend zur Historie
+    :param window: Anzahl der aufzubewahrenden Stunden (default: größter Lag)
+    :return: Tuple (neue Zeilen mit Features, neues Historienfenster)
+    """
+    validate_new_rows(history_tail, new_rows)
+
+    if len(history_tail) < window:
+        print(f"Warning: Historie hat nur {len(history_tail)} Stunden, für alle Lags werden {window} benötigt.")
+
+    new_data = new_rows[RAW_COLUMNS + ["Tageszeit"]].copy()
+    new_data["Tageszeit_sin"] = np.sin(2 * np.pi * new_data["Tageszeit"] / 24)
+    new_data["Tageszeit_cos"] = np.cos(2 * np.pi * new_data["Tageszeit"] / 24)
+
+    # Lags und Änderungsraten über Historienfenster + neue Stunden
+    tail = history_tail[RAW_COLUMNS].iloc[-window:]
+    window_data = pd.concat([tail, new_data[RAW_COLUMNS]], ignore_index=True)
+    new_index = np.arange(len(tail), len(window_data))
+
+    for feature, (source, lag) in LAG_FEATURES.items():
+        new_data[feature] = window_data[source].shift(lag).to_numpy()[new_index]
+
+    new_data["Nachfrage_change"] = window_data["Nachfrage"].pct_change().to_numpy()[new_index]
+    new_data["Preis_change"] = window_data["Strompreis"].pct_change().to_numpy()[new_index]
+    new_data["Elastizität"] = new_data["Nachfrage_change"] / new_data["Preis_change"]
+    new_data["Elastizität"] = new_data["Elastizität"].replace([np.inf, -np.inf], np.nan)
+
+    # Neues Fenster für den nächsten Aufruf
+    # Index bleibt erhalten, damit der nächste Aufruf Überschneidungen erkennt
+    new_tail = pd.concat([history_tail.iloc[-window:], new_data]).iloc[-window:]
+
+    return new_data, new_tail
+
+
+class IncrementalOLS:
+    """
+    OLS-Modell, das nur über seine suffizienten Statistiken (XᵀX, Xᵀy, yᵀy)
+    geführt wird. Neue Stunden werden in O(neue Zeilen) eingearbeitet, die
+    Koeffizienten entsprechen sm.OLS(y, sm.add_constant(X)).fit().params.
+    """
+
+    def __init__(self, exog_columns, endog_column, add_constant=True):
+        """
+        :param exog_columns: Liste der erklärenden Variablen
+        :param endog_column: Name der abhängigen Variable
+        :param add_constant: Wenn True, wird eine Konstante "const" ergänzt (wie sm.add_constant)
+        """
+        self.exog_columns = list(exog_columns)
+        self.endog_column = endog_column
+        self.add_constant = add_constant
+        self.param_names = (["const"] if add_constant else []) + self.exog_columns
+
+        k = len(self.param_names)
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.yty = 0.0
+        self.y_sum = 0.0
+        self.nobs = 0
+
+    @classmethod
+    def from_frame(cls, data, exog_columns, endog_column, add_constant=True):
+        """
+        Erstellt das Modell aus einem bestehenden DataFrame (einmalige volle Berechnung).
+
+        :param data: DataFrame mit allen Spalten
+        :param exog_columns: Liste der erklärenden Variablen
+        :param endog_column: Name der abhängigen Variable
+        :param add_constant: Wenn True, wird eine Konstante ergänzt
+        :return: IncrementalOLS
+        """
+        model = cls(exog_columns, endog_column, add_constant=add_constant)
+        model.update(data)
+        return model
+
+    def _design(self, data):
+        X = data[self.exog_columns].to_numpy(dtype=float)
+        if self.add_constant:
+            X = np.column_stack([np.ones(len(X)), X])
+        return X
+
+    def update(self, new_rows):
+        """
+        Arbeitet neue Zeilen in die suffizienten Statistiken ein.
+        Zeilen mit fehlenden Werten werden wie bei statsmodels (missing="drop") ignoriert.
+
+        :param new_rows: DataFrame mit den neuen Zeilen
+        :return: self
+        """
+        rows = new_rows[self.exog_columns + [self.endog_column]].dropna()
+        X = self._design(rows)
+        y = rows[self.endog_column].to_numpy(dtype=float)
+
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += y @ y
+        self.y_sum += y.sum()
+        self.nobs += len(y)
+        return self
+
+    @property
+    def params(self):
+        """Koeffizienten als Series (Index wie bei statsmodels)."""
+        try:
+            beta = np.linalg.solve(self.xtx, self.xty)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return pd.Series(beta, index=self.param_names)
+
+    @property
+    def ssr(self):
+        """Residuenquadratsumme aus yᵀy - 2βᵀXᵀy + βᵀXᵀXβ."""
+        beta = self.params.to_numpy()
+        return self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta
+
+    @property
+    def df_resid(self):
+        return self.nobs - len(self.param_names)
+
+    @property
+    def scale(self):
+        """Geschätzte Residuenvarianz (wie results.scale)."""
+        return self.ssr / self.df_resid
+
+    @property
+    def rsquared(self):
+        """Bestimmtheitsmaß (mit Konstante zentriert, sonst unzentriert wie statsmodels)."""
+        if self.add_constant:
+            tss = self.yty - self.y_sum ** 2 / self.nobs
+        else:
+            tss = self.yty
+        return 1 - self.ssr / tss
+
+    @property
+    def bse(self):
+        """Standardfehler der Koeffizienten (klassische OLS-Kovarianz)."""
+        cov = self.scale * np.linalg.pinv(self.xtx)
+        return pd.Series(np.sqrt(np.diag(cov)), index=self.param_names)
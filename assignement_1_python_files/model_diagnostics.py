@@ -0,0 +1,161 @@
+import os
+import pandas as pd
+import numpy as np
+from scipy import stats
+
+# Feste Ablage der Vergleichstabelle (Verzeichnis output/ im Projekt, nicht versioniert)
+DEFAULT_OUTPUT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output", "diagnostics.csv"))
+
+
+def _model_arrays(model):
+    """
+    Liefert (exog, endog, resid) eines Modells.
+
+    :param model: statsmodels-OLS-Ergebnis oder Tuple (exog, endog)
+    :return: Tuple (exog als Array (n_obs, k), endog als Array (n_obs), Residuen oder None bei Tuple)
+    """
+    if isinstance(model, tuple):
+        exog, endog = model
+        resid = None
+    else:
+        exog, endog, resid = model.model.exog, model.model.endog, np.asarray(model.resid, dtype=float)
+    return np.asarray(exog, dtype=float), np.asarray(endog, dtype=float), resid
+
+
+def batch_diagnostics(exog, endog, resid=None):
+    """
+    Berechnet die Diagnostik für einen Stapel von OLS-Modellen gleicher Form.
+
+    Alle Kennzahlen werden gemeinsam für alle Modelle über Matrixoperationen aus der
+    Residuenmatrix berechnet, ohne summary() aufzubauen. Ohne resid werden die Modelle
+    per QR-Zerlegung geschätzt (nicht über XᵀX, das die Konditionszahl quadriert).
+    Die erste Spalte von exog wird als Konstante erwartet (wie sm.add_constant).
+
+    :param exog: Array (n_models, n_obs, k)
+    :param endog: Array (n_models, n_obs)
+    :param resid: Array (n_models, n_obs) mit den Residuen der geschätzten Modelle (optional)
+    :return: DataFrame mit einer Zeile je Modell
+    """
+    n_models, n_obs, k = exog.shape
+    q, r = np.linalg.qr(exog)
+    qt = np.swapaxes(q, 1, 2)
+
+    def residuals(target):
+        # Residuen der Projektion auf den Spaltenraum von exog: target - Q Qᵀ target
+        return target - (q @ (qt @ target[:, :, None]))[:, :, 0]
+
+    if resid is None:
+        resid = residuals(endog)
+
+    ssr = (resid ** 2).sum(axis=1)
+    tss = ((endog - endog.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    df_model = k - 1
+    df_resid = n_obs - k
+
+    rsquared = 1 - ssr / tss
+    rsquared_adj = 1 - (1 - rsquared) * (n_obs - 1) / df_resid
+    f_stat = ((tss - ssr) / df_model) / (ssr / df_resid)
+    f_pvalue = stats.f.sf(f_stat, df_model, df_resid)
+
+    # Durbin-Watson
+    durbin_watson = (np.diff(resid, axis=1) ** 2).sum(axis=1) / ssr
+
+    # Jarque-Bera
+    centered = resid - resid.mean(axis=1, keepdims=True)
+    variance = (centered ** 2).mean(axis=1)
+    skew = (centered ** 3).mean(axis=1) / variance ** 1.5
+    kurtosis = (centered ** 4).mean(axis=1) / variance ** 2
+    jarque_bera = n_obs / 6 * (skew ** 2 + (kurtosis - 3) ** 2 / 4)
+    jb_pvalue = stats.chi2.sf(jarque_bera, 2)
+
+    # Breusch-Pagan: Hilfsregression von e² auf die Regressoren, LM = n * R²
+    resid_sq = resid ** 2
+    aux_resid = residuals(resid_sq)
+    aux_tss = ((resid_sq - resid_sq.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    breusch_pagan = n_obs * (1 - (aux_resid ** 2).sum(axis=1) / aux_tss)
+    bp_pvalue = stats.chi2.sf(breusch_pagan, df_model)
+
+    # Konditionszahl wie in statsmodels, sqrt(max/min Eigenwert von XᵀX), hier aus den Singulärwerten von R
+    singular_values = np.linalg.svd(r, compute_uv=False)
+    condition_number = singular_values[:, 0] / singular_values[:, -1]
+
+    return pd.DataFrame({
+        "nobs": n_obs,
+        "df_model": df_model,
+        "r2": rsquared,
+        "r2_adj": rsquared_adj,
+        "f_stat": f_stat,
+        "f_pvalue": f_pvalue,
+        "durbin_watson": durbin_watson,
+        "jarque_bera": jarque_bera,
+        "jb_pvalue": jb_pvalue,
+        "skew": skew,
+        "kurtosis": kurtosis,
+        "breusch_pagan": breusch_pagan,
+        "bp_pvalue": bp_pvalue,
+        "condition_number": condition_number,
+    })
+
+
+def diagnostics_table(models):
+    """
+    Erstellt eine Vergleichstabelle für viele Modelle.
+
+    Modelle mit gleicher Form werden gestapelt und gemeinsam berechnet. Für
+    geschätzte Modelle werden deren Residuen verwendet, Tupel (exog, endog)
+    werden neu geschätzt.
+
+    :param models: Dictionary Name -> statsmodels-OLS-Ergebnis oder Tuple (exog, endog)
+    :return: DataFrame mit einer Zeile je Modell (Index = Name)
+    """
+    arrays = {name: _model_arrays(model) for name, model in models.items()}
+
+    groups = {}
+    for name, (exog, _, resid) in arrays.items():
+        groups.setdefault((exog.shape, resid is None), []).append(name)
+
+    tables = []
+    for (_, refit), names in groups.items():
+        exog = np.stack([arrays[name][0] for name in names])
+        endog = np.stack([arrays[name][1] for name in names])
+        resid = None if refit else np.stack([arrays[name][2] for name in names])
+        table = batch_diagnostics(exog, endog, resid)
+        table.index = names
+        tables.append(table)
+
+    return pd.concat(tables).loc[list(models)]
+
+
+def coefficient_table(results):
+    """
+    Kompakte Koeffiziententabelle als Ersatz für results.summary().
+
+    :param results: statsmodels-OLS-Ergebnis (z.B. aus robust_results)
+    :return: DataFrame mit coef, std_err, t, p_value je Variable
+    """
+    return pd.DataFrame({
+        "coef": results.params,
+        "std_err": results.bse,
+        "t": results.tvalues,
+        "p_value": results.pvalues,
+    })
+
+
+def write_diagnostics(table, file_path=DEFAULT_OUTPUT):
+    """
+    Schreibt die Vergleichstabelle je nach Dateiendung als CSV, Parquet oder HTML.
+
+    :param table: DataFrame aus diagnostics_table
+    :param file_path: Pfad der Ausgabedatei (.csv, .parquet oder .html), default: output/diagnostics.csv
+    :return: Pfad der Ausgabedatei
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    if file_path.endswith(".csv"):
+        table.to_csv(file_path, index_label="Modell")
+    elif file_path.endswith(".parquet"):
+        table.to_parquet(file_path)
+    elif file_path.endswith(".html"):
+        table.to_html(file_path, float_format="{:.4f}".format)
+    else:
+        raise ValueError(f"Unbekanntes Format für '{file_path}', erlaubt sind .csv, .parquet und .html.")
+    return file_path
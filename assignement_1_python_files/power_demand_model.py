@@ -8,6 +8,8 @@ import numpy as np
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
+from project_models import demand_features, fit_demand_models
+from model_diagnostics import coefficient_table, diagnostics_table
 
 importlib.reload(prepare_input_data)
 
@@ -21,52 +23,16 @@ power_gen_file = "data_assignement_1/power_gen.xlsx"
 # Daten laden
 combined_data = prepare_combined_data(demand_file, price_file, weather_file, import_export_file, power_gen_file)
 
-# 1. Lag-Variable erstellen
-combined_data = combined_data.copy()  # Explizite Kopie erstellen
-combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage"].shift(1)
-mean_lag = combined_data["Nachfrage"].mean()
-combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage_lag1"].fillna(mean_lag)
-
-# Tageszeit als kategorische Variable (6-Stunden-Blöcke)
-combined_data['Tagesblock'] = pd.cut(combined_data['Tageszeit'],
-                                   bins=[0, 6, 12, 18, 24],
-                                   labels=['Nacht', 'Morgen', 'Nachmittag', 'Abend'])
-
-# Dummy-Variablen mit 0/1-Kodierung
-dummies = pd.get_dummies(combined_data['Tagesblock'],
-                        prefix='Tageszeit',
-                        drop_first=True).astype(int)
-
-# Originale Tageszeit-Spalten entfernen (falls gewünscht)
-combined_data.drop('Tagesblock', axis=1, inplace=True)
-
-# Neue Variablen hinzufügen
-combined_data = pd.concat([combined_data, dummies], axis=1)
-
-combined_data['Nachfrage_change'] = combined_data['Nachfrage'].pct_change()
-combined_data['Preis_change'] = combined_data['Strompreis'].pct_change()
-combined_data['Elastizität'] = combined_data['Nachfrage_change'] / combined_data['Preis_change']
-
-# Step 1: Replace infinities with NaN
-combined_data['Elastizität'] = combined_data['Elastizität'].replace([np.inf, -np.inf], np.nan)
-
-# Step 2: Drop all NaN values (including former infinities)
-combined_data = combined_data.dropna(subset=['Elastizität'])
+# Features (Lag, Tageszeit-Dummies, Elastizität) und Modelle, siehe project_models.py
+combined_data = demand_features(combined_data)
+diagnostics_models = fit_demand_models(combined_data)
 
 
 
 #%%
-# ARX Modell
-X = combined_data[[ 'Stromexport','Stromimport', 'Stromerzeugung']]
-X = sm.add_constant(X)  # Konstante hinzufügen
-y = combined_data['Nachfrage']
-
-# 4. Regression
-model = sm.OLS(y, X)
-results = model.fit()
-
-# 5. Ergebnisse + Diagnostik
-print(results.summary())
+# ARX Modell (Stromexport, Stromimport, Stromerzeugung)
+results = diagnostics_models["Nachfrage Modell 1 (Energiebilanz)"]
+print(coefficient_table(results))
 
 
 # Residuen und angepasste Werte berechnen
@@ -111,17 +77,9 @@ vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(X.shape
 print(vif_data)
 
 
-#%% Zeit Modell
-X = combined_data[['Nachfrage_lag1', 'Tageszeit_cos', 'Tageszeit_sin']]
-X = sm.add_constant(X)  # Konstante hinzufügen
-y = combined_data['Nachfrage']
-
-# 4. Regression
-model = sm.OLS(y, X)
-results = model.fit()
-
-# 5. Ergebnisse + Diagnostik
-print(results.summary())
+#%% Zeit Modell (Nachfrage_lag1, Tageszeit_cos, Tageszeit_sin)
+results = diagnostics_models["Nachfrage Modell 2 (Zeit)"]
+print(coefficient_table(results))
 
 fitted_values = results.fittedvalues
 residuals = results.resid
@@ -161,4 +119,7 @@ vif_data["Variable"] = X.columns
 vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(X.shape[1])]
 
 # Ergebnisse anzeigen
-print(vif_data)
\ No newline at end of file
+print(vif_data)
+
+#%% Vergleichstabelle der Modelle
+print(diagnostics_table(diagnostics_models))
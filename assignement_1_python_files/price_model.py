@@ -9,6 +9,8 @@ import numpy as np
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
+from project_models import price_features, fit_price_models
+from model_diagnostics import coefficient_table, diagnostics_table
 
 importlib.reload(prepare_input_data)
 
@@ -21,38 +23,17 @@ power_gen_file = "data_assignement_1/power_gen.xlsx"
 
 combined_data = prepare_combined_data(demand_file, price_file, weather_file, import_export_file, power_gen_file)
 
-# 1. Lag-Variable erstellen
-combined_data = combined_data.copy()  # Explizite Kopie erstellen
-combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage"].shift(1)
-mean_lag = combined_data["Nachfrage"].mean()
-combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage_lag1"].fillna(mean_lag)
-
-
-
-# Lags des Strompreises erstellen
-combined_data.loc[:, "Strompreis_lag1"] = combined_data["Strompreis"].shift(1)
-combined_data.loc[:, "Strompreis_lag24"] = combined_data["Strompreis"].shift(24)
-combined_data.loc[:, "Strompreis_lag168"] = combined_data["Strompreis"].shift(168)
-
-# Fehlende Werte mit dem Mittelwert des Strompreises auffüllen
-mean_price = combined_data["Strompreis"].mean()
-combined_data.loc[:, ["Strompreis_lag1", "Strompreis_lag24", "Strompreis_lag168"]] = combined_data[
-    ["Strompreis_lag1", "Strompreis_lag24", "Strompreis_lag168"]
-].fillna(mean_price)
+# Lag-Features und Modell, siehe project_models.py
+combined_data = price_features(combined_data)
+diagnostics_models = fit_price_models(combined_data)
 
 
 #%%
-# herausfinden welcher lag den höchsten einfluss hat.
-X = combined_data[['Nachfrage', 'Temperatur','Strompreis_lag1']]
-X = sm.add_constant(X)  # Konstante hinzufügen
-y = combined_data['Strompreis']
-
-# 4. Regression
-model = sm.OLS(y, X)
-results = model.fit()
+# herausfinden welcher lag den höchsten einfluss hat (Nachfrage, Temperatur, Strompreis_lag1)
+results = diagnostics_models["Strompreis Modell 2C (Nachfrage, Temperatur, Lag 1)"]
 
 # 5. Ergebnisse + Diagnostik
-print(results.summary())
+print(coefficient_table(results))
 # Residuen und angepasste Werte berechnen
 
 
@@ -91,3 +72,62 @@ vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(X.shape
 # Ergebnisse anzeigen
 print(vif_data)
 
+
+#%% Vergleichstabelle der Modelle
+print(diagnostics_table(diagnostics_models))
+
+#%% Inkrementelles Update: neue Stunden ohne vollständige Neuberechnung
+from incremental_update import IncrementalOLS, append_new_hours, RAW_COLUMNS
+
+# Auffrischung am Beispiel der letzten Woche: Modell aus den übrigen Stunden aufbauen,
+# die letzten 168 Stunden wie neu gelieferte Rohdaten anhängen
+n_new = 168
+incremental_model = IncrementalOLS.from_frame(combined_data.iloc[:-n_new], ['Nachfrage', 'Temperatur', 'Strompreis_lag1'], 'Strompreis')
+history_tail = combined_data.iloc[:-n_new].iloc[-168:]
+new_rows = combined_data.iloc[-n_new:][RAW_COLUMNS + ["Tageszeit"]]
+
+new_data, history_tail = append_new_hours(history_tail, new_rows)
+incremental_model.update(new_data)
+
+# Gleiches Ergebnis wie die volle Schätzung oben
+print(pd.DataFrame({"inkrementell": incremental_model.params, "voll": results.params}))
+print(f"R²: {incremental_model.rsquared:.4f}")
+
+#%% Preisszenarien für Heat_Model (Monte Carlo)
+# Nur bei Bedarf schreiben (~35 MB), Ausgabe in das nicht versionierte Verzeichnis output/
+WRITE_PRICE_PATHS = False
+
+if WRITE_PRICE_PATHS:
+    import os
+    import sys
+    sys.path.append("assignement_2_python_files")
+    from price_scenarios import write_price_paths
+
+    os.makedirs("output", exist_ok=True)
+    write_price_paths("output/price_paths.npy", results.params,
+                      combined_data["Nachfrage"], combined_data["Temperatur"],
+                      residuals=results.resid, n_paths=1000, seed=42)
+
+#%% Dünnbesetzte Regression mit Kalender- und Lag-Features
+# OLS mit 337 Variablen (168 Wochenstunden, 168 Preis-Lags) nur auf Wunsch,
+# combined_data bleibt unverändert (Wochenstunde nur in einer Kopie)
+RUN_SPARSE_REGRESSION = False
+
+# Lasso-Pfad (20 alpha-Werte, Koordinatenabstieg) dauert zusätzlich rund eine Minute
+RUN_LASSO_PATH = False
+
+if RUN_SPARSE_REGRESSION:
+    from sparse_regression import sparse_design, fit_ols, regularization_path
+
+    sparse_data = combined_data.assign(Wochenstunde=np.arange(len(combined_data)) % 168)
+    X_sparse, feature_names = sparse_design(
+        sparse_data,
+        numeric_columns=['Nachfrage', 'Temperatur'],
+        categorical_columns=['Wochenstunde'],
+        lags={'Strompreis': list(range(1, 169))},
+    )
+    print(fit_ols(X_sparse, sparse_data['Strompreis'], names=feature_names).head(10))
+
+    if RUN_LASSO_PATH:
+        lasso_path = regularization_path(X_sparse, sparse_data['Strompreis'], method="lasso", names=feature_names)
+        print((lasso_path != 0).sum())  # Anzahl aktiver Variablen je alpha
@@ -0,0 +1,175 @@
+import os
+import pandas as pd
+import numpy as np
+import statsmodels.api as sm
+from prepare_input_data import prepare_combined_data
+from robust_inference import robust_results
+
+# Datenaufbereitung und Modelle aus power_demand_model.py, price_model.py und
+# strompreismodellierung.py. Die Skripte rufen diese Funktionen auf und ergänzen
+# Plots und VIF, diagnostics_report.py braucht nur die geschätzten Modelle.
+
+DATA_DIR = "data_assignement_1"
+
+
+def load_combined_data(data_dir=DATA_DIR):
+    """
+    Lädt die kombinierten Stundendaten wie in power_demand_model.py und price_model.py.
+
+    :param data_dir: Verzeichnis mit den Rohdaten
+    :return: DataFrame aus prepare_combined_data
+    """
+    return prepare_combined_data(
+        os.path.join(data_dir, "hourly_load_profile_electricity_AT_2023.xlsx"),
+        os.path.join(data_dir, "preise2023.csv"),
+        os.path.join(data_dir, "Wetterdaten_Basel_2023.csv"),
+        os.path.join(data_dir, "Import_Export_Data.xlsx"),
+        os.path.join(data_dir, "power_gen.xlsx"),
+    )
+
+
+def _add_demand_lag(combined_data):
+    combined_data = combined_data.copy()  # Explizite Kopie erstellen
+    combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage"].shift(1)
+    mean_lag = combined_data["Nachfrage"].mean()
+    combined_data.loc[:, "Nachfrage_lag1"] = combined_data["Nachfrage_lag1"].fillna(mean_lag)
+    return combined_data
+
+
+def demand_features(combined_data):
+    """
+    Features der Nachfragemodelle: Lag, Tageszeit-Dummies und Elastizität.
+
+    :param combined_data: DataFrame aus prepare_combined_data
+    :return: DataFrame mit den zusätzlichen Spalten (Zeilen ohne Elastizität entfernt)
+    """
+    combined_data = _add_demand_lag(combined_data)
+
+    # Tageszeit als kategorische Variable (6-Stunden-Blöcke)
+    combined_data['Tagesblock'] = pd.cut(combined_data['Tageszeit'],
+                                       bins=[0, 6, 12, 18, 24],
+                                       labels=['Nacht', 'Morgen', 'Nachmittag', 'Abend'])
+
+    # Dummy-Variablen mit 0/1-Kodierung
+    dummies = pd.get_dummies(combined_data['Tagesblock'],
+                            prefix='Tageszeit',
+                            drop_first=True).astype(int)
+
+    combined_data.drop('Tagesblock', axis=1, inplace=True)
+    combined_data = pd.concat([combined_data, dummies], axis=1)
+
+    combined_data['Nachfrage_change'] = combined_data['Nachfrage'].pct_change()
+    combined_data['Preis_change'] = combined_data['Strompreis'].pct_change()
+    combined_data['Elastizität'] = combined_data['Nachfrage_change'] / combined_data['Preis_change']
+
+    # Unendliche Werte zu NaN, dann alle NaN entfernen
+    combined_data['Elastizität'] = combined_data['Elastizität'].replace([np.inf, -np.inf], np.nan)
+    return combined_data.dropna(subset=['Elastizität'])
+
+
+def price_features(combined_data):
+    """
+    Features des Preismodells: Lags von Nachfrage und Strompreis.
+
+    :param combined_data: DataFrame aus prepare_combined_data
+    :return: DataFrame mit den Lag-Spalten (fehlende Werte mit dem Mittelwert aufgefüllt)
+    """
+    combined_data = _add_demand_lag(combined_data)
+
+    combined_data.loc[:, "Strompreis_lag1"] = combined_data["Strompreis"].shift(1)
+    combined_data.loc[:, "Strompreis_lag24"] = combined_data["Strompreis"].shift(24)
+    combined_data.loc[:, "Strompreis_lag168"] = combined_data["Strompreis"].shift(168)
+
+    # Fehlende Werte mit dem Mittelwert des Strompreises auffüllen
+    mean_price = combined_data["Strompreis"].mean()
+    combined_data.loc[:, ["Strompreis_lag1", "Strompreis_lag24", "Strompreis_lag168"]] = combined_data[
+        ["Strompreis_lag1", "Strompreis_lag24", "Strompreis_lag168"]
+    ].fillna(mean_price)
+    return combined_data
+
+
+def _fit(data, exog_columns, endog_column):
+    X = sm.add_constant(data[exog_columns])  # Konstante hinzufügen
+    y = data[endog_column]
+    return robust_results(sm.OLS(y, X).fit(), maxlags=168)  # HAC-Standardfehler wegen autokorrelierter Residuen
+
+
+def fit_demand_models(data):
+    """
+    Schätzt die Nachfragemodelle aus power_demand_model.py.
+
+    :param data: DataFrame aus demand_features
+    :return: Dictionary Modellname -> statsmodels-Ergebnis mit HAC-Kovarianz
+    """
+    return {
+        "Nachfrage Modell 1 (Energiebilanz)": _fit(data, ['Stromexport', 'Stromimport', 'Stromerzeugung'], 'Nachfrage'),
+        "Nachfrage Modell 2 (Zeit)": _fit(data, ['Nachfrage_lag1', 'Tageszeit_cos', 'Tageszeit_sin'], 'Nachfrage'),
+    }
+
+
+def fit_price_models(data):
+    """
+    Schätzt das Preismodell aus price_model.py.
+
+    :param data: DataFrame aus price_features
+    :return: Dictionary Modellname -> statsmodels-Ergebnis mit HAC-Kovarianz
+    """
+    return {
+        "Strompreis Modell 2C (Nachfrage, Temperatur, Lag 1)": _fit(data, ['Nachfrage', 'Temperatur', 'Strompreis_lag1'], 'Strompreis'),
+    }
+
+
+def load_strompreis_data(data_dir=DATA_DIR):
+    """
+    Lädt Last und Preise mit Kalendervariablen wie in strompreismodellierung.py.
+
+    :param data_dir: Verzeichnis mit den Rohdaten
+    :return: DataFrame mit DateUTC, Stunde, Wochentag, Monat, Last und Preis
+    """
+    load_data = pd.read_excel(os.path.join(data_dir, "hourly_load_profile_electricity_AT_2023.xlsx"))
+    price_data = pd.read_csv(os.path.join(data_dir, "preise2023.csv"), sep=";")
+
+    # Zeitvariablen extrahieren
+    load_data['DateUTC'] = pd.to_datetime(load_data['DateUTC'])
+    load_data['Stunde'] = load_data['DateUTC'].dt.hour
+    load_data['Wochentag'] = load_data['DateUTC'].dt.weekday
+    load_data['Monat'] = load_data['DateUTC'].dt.month
+    load_data.rename(columns={'Value': 'Last'}, inplace=True)
+    load_data['Preis'] = price_data['AT'].astype(float)
+    return load_data
+
+
+def fit_strompreis_models(load_data):
+    """
+    Schätzt die Strompreismodelle aus strompreismodellierung.py (mit und ohne Extremwerte).
+
+    :param load_data: DataFrame aus load_strompreis_data
+    :return: Dictionary Modellname -> statsmodels-Ergebnis mit HAC-Kovarianz
+    """
+    df = load_data[['Stunde', 'Wochentag', 'Monat', 'Last', 'Preis']].copy()
+
+    # Oberstes und unterstes 1% der Preise weglassen
+    upper_threshold = df['Preis'].quantile(0.99)
+    lower_threshold = df['Preis'].quantile(0.01)
+    df_filtered = df[(df['Preis'] > lower_threshold) & (df['Preis'] < upper_threshold)]
+
+    exog_columns = ['Stunde', 'Wochentag', 'Monat', 'Last']
+    return {
+        "Strompreis Modell 1 (ohne Extremwerte)": _fit(df_filtered, exog_columns, 'Preis'),
+        "Strompreis Modell 1": _fit(df, exog_columns, 'Preis'),
+    }
+
+
+def fit_project_models(data_dir=DATA_DIR):
+    """
+    Schätzt alle Modelle des Projekts, ohne Plots und ohne die übrigen Abschnitte der Skripte.
+
+    :param data_dir: Verzeichnis mit den Rohdaten
+    :return: Dictionary Modellname -> statsmodels-Ergebnis mit HAC-Kovarianz
+    """
+    combined_data = load_combined_data(data_dir)
+    return {
+        **fit_demand_models(demand_features(combined_data)),
+        **fit_price_models(price_features(combined_data)),
+        **fit_strompreis_models(load_strompreis_data(data_dir)),
+    }
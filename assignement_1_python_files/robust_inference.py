@@ -0,0 +1,191 @@
+import numpy as np
+from statsmodels.regression.linear_model import RegressionResultsWrapper
+
+
+# Bis zu dieser Lag-Anzahl ist die direkte Summe (eine Matrixmultiplikation je Lag) schneller
+# als die FFT; gemessen bei n = 8760 liegt der Umschlagpunkt bei rund 500 Lags, unabhängig von k
+DIRECT_MAX_LAG = 512
+
+# Obergrenze für die Anzahl komplexer Einträge des Kreuzspektrums je Block (FFT-Variante)
+BLOCK_SIZE = 2 ** 22
+
+
+def _autocovariances(scores, max_lag):
+    """
+    Berechnet die Autokovarianzmatrizen der Scores für die Lags 0..max_lag.
+
+    Bis DIRECT_MAX_LAG direkt als Summe über t, darüber per FFT. Das Kreuzspektrum
+    wird dabei blockweise über die Spalten aufgebaut, sodass nie alle k x k Paare
+    über alle Frequenzen gleichzeitig im Speicher liegen.
+
+    :param scores: Array (n_models, n_obs, k) mit den Scores x_t * e_t
+    :param max_lag: größter benötigter Lag
+    :return: Array (n_models, max_lag + 1, k, k), Gamma_j = sum_t s_t s_{t-j}ᵀ / n
+    """
+    n_models, n_obs, k = scores.shape
+    gamma = np.empty((n_models, max_lag + 1, k, k))
+
+    if max_lag <= DIRECT_MAX_LAG:
+        scores_t = np.swapaxes(scores, 1, 2)
+        for j in range(max_lag + 1):
+            gamma[:, j] = scores_t[:, :, j:] @ scores[:, :n_obs - j]
+        return gamma / n_obs
+
+    n_fft = 1 << int(np.ceil(np.log2(2 * n_obs - 1)))
+    spectrum = np.fft.rfft(scores, n=n_fft, axis=1)
+    columns = max(1, BLOCK_SIZE // (n_models * spectrum.shape[1] * k))
+    for first in range(0, k, columns):
+        block = slice(first, first + columns)
+        # Kreuzspektrum der Paare (a, b) für a im Block: F_a * conj(F_b)
+        cross = spectrum[:, :, block, None] * np.conj(spectrum[:, :, None, :])
+        gamma[:, :, block] = np.fft.irfft(cross, n=n_fft, axis=1)[:, :max_lag + 1]
+    return gamma / n_obs
+
+
+def newey_west_bandwidth(scores, kernel="bartlett"):
+    """
+    Automatische Bandbreitenwahl nach Newey-West (1994).
+
+    :param scores: Array (n_models, n_obs, k) mit den Scores
+    :param kernel: "bartlett" oder "parzen"
+    :return: Array (n_models) mit den Bandbreiten (Anzahl Lags)
+    """
+    n_obs = scores.shape[1]
+    if kernel == "bartlett":
+        exponent, constant, q = 2 / 9, 1.1447, 1
+    elif kernel == "parzen":
+        exponent, constant, q = 4 / 25, 2.6614, 2
+    else:
+        raise ValueError(f"Unbekannter Kernel '{kernel}', erlaubt sind 'bartlett' und 'parzen'.")
+
+    # Vorläufige Bandbreite und Summe der Scores (gleiche Gewichte) als skalare Reihe
+    pilot = int(4 * (n_obs / 100) ** exponent)
+    summed = scores.sum(axis=2)
+    summed = summed - summed.mean(axis=1, keepdims=True)
+
+    gamma = _autocovariances(summed[:, :, None], pilot)[:, :, 0, 0]
+    lags = np.arange(1, pilot + 1)
+    s0 = gamma[:, 0] + 2 * gamma[:, 1:].sum(axis=1)
+    sq = 2 * (gamma[:, 1:] * lags ** q).sum(axis=1)
+
+    gamma_hat = constant * np.abs(sq / s0) ** (2 / (2 * q + 1))
+    bandwidth = gamma_hat * n_obs ** (1 / (2 * q + 1))
+    return np.minimum(bandwidth, n_obs - 1)
+
+
+def _kernel_weights(lags, bandwidth, kernel):
+    z = lags / (bandwidth + 1)
+    if kernel == "bartlett":
+        return np.clip(1 - z, 0, None)
+    # Parzen
+    return np.where(z <= 0.5, 1 - 6 * z ** 2 + 6 * z ** 3, np.where(z <= 1, 2 * (1 - z) ** 3, 0.0))
+
+
+def hac_covariance(exog, resid, maxlags=None, kernel="bartlett", use_correction=False):
+    """
+    HAC-Kovarianz (Newey-West) der OLS-Koeffizienten für ein oder mehrere Modelle.
+
+    Die Autokovarianzen der Scores werden für alle Modelle eines Stapels gemeinsam
+    berechnet (direkte Summe, bei sehr vielen Lags per FFT, siehe _autocovariances).
+    Ohne maxlags wird die Bandbreite je Modell automatisch gewählt.
+
+    :param exog: Designmatrix (n_obs, k) oder Stapel (n_models, n_obs, k)
+    :param resid: Residuen (n_obs) oder Stapel (n_models, n_obs)
+    :param maxlags: Anzahl der Lags (z.B. 168) oder None für automatische Wahl
+    :param kernel: "bartlett" (wie statsmodels cov_type="HAC") oder "parzen"
+    :param use_correction: Wenn True, Korrektur um n / (n - k) (default False wie statsmodels cov_type="HAC")
+    :return: Array (k, k) bzw. (n_models, k, k)
+    """
+    exog = np.asarray(exog, dtype=float)
+    resid = np.asarray(resid, dtype=float)
+    single = exog.ndim == 2
+    if single:
+        exog, resid = exog[None], resid[None]
+
+    n_models, n_obs, k = exog.shape
+    scores = exog * resid[:, :, None]
+
+    if maxlags is None:
+        bandwidth = newey_west_bandwidth(scores, kernel=kernel)
+    else:
+        bandwidth = np.full(n_models, float(maxlags))
+    max_lag = int(np.ceil(bandwidth.max())) + 1
+
+    gamma = _autocovariances(scores, min(max_lag, n_obs - 1))
+    lags = np.arange(gamma.shape[1])
+    weights = _kernel_weights(lags[None, :], bandwidth[:, None], kernel)
+
+    # S = Gamma_0 + sum_j w_j (Gamma_j + Gamma_jᵀ)
+    weighted = (weights[:, 1:, None, None] * gamma[:, 1:]).sum(axis=1)
+    meat = (gamma[:, 0] + weighted + np.swapaxes(weighted, 1, 2)) * n_obs
+
+    bread = np.linalg.inv(np.swapaxes(exog, 1, 2) @ exog)
+    cov = bread @ meat @ bread
+    if use_correction:
+        cov = cov * n_obs / (n_obs - k)
+
+    return cov[0] if single else cov
+
+
+def robust_results(results, maxlags=None, kernel="bartlett", use_correction=False):
+    """
+    Drop-in-Ersatz für results.get_robustcov_results(cov_type="HAC", ...).
+
+    Das zurückgegebene Ergebnis verhält sich wie ein statsmodels-OLS-Ergebnis
+    (params, resid, fittedvalues, ...), bse, tvalues, pvalues, conf_int() und
+    summary() beruhen aber auf der HAC-Kovarianz.
+
+    :param results: Ergebnis von sm.OLS(...).fit()
+    :param maxlags: Anzahl der Lags oder None für automatische Wahl
+    :param kernel: "bartlett" oder "parzen"
+    :param use_correction: Wenn True, Korrektur um n / (n - k) wie bei get_robustcov_results
+    :return: statsmodels-Ergebnis mit HAC-Kovarianz
+    """
+    return batch_robust_results([results], maxlags=maxlags, kernel=kernel, use_correction=use_correction)[0]
+
+
+def batch_robust_results(results_list, maxlags=None, kernel="bartlett", use_correction=False):
+    """
+    Berechnet HAC-Kovarianzen für viele Modelle in einem Durchlauf.
+
+    Modelle mit gleicher Beobachtungszahl und Variablenanzahl werden gestapelt
+    und gemeinsam verarbeitet.
+
+    :param results_list: Liste von statsmodels-OLS-Ergebnissen
+    :param maxlags: Anzahl der Lags oder None für automatische Wahl
+    :param kernel: "bartlett" oder "parzen"
+    :param use_correction: Wenn True, Korrektur um n / (n - k) wie bei get_robustcov_results
+    :return: Liste von Ergebnissen mit HAC-Kovarianz, Reihenfolge wie results_list
+    """
+    groups = {}
+    for i, results in enumerate(results_list):
+        groups.setdefault(results.model.exog.shape, []).append(i)
+
+    robust = [None] * len(results_list)
+    for indices in groups.values():
+        exog = np.stack([results_list[i].model.exog for i in indices])
+        resid = np.stack([np.asarray(results_list[i].resid) for i in indices])
+        covs = hac_covariance(exog, resid, maxlags=maxlags, kernel=kernel, use_correction=use_correction)
+
+        for i, cov in zip(indices, covs):
+            robust[i] = _with_covariance(results_list[i], cov, maxlags, kernel, use_correction)
+    return robust
+
+
+def _with_covariance(results, cov, maxlags, kernel, use_correction):
+    """Neues Ergebnis mit Kovarianz cov, aufgebaut wie in get_robustcov_results."""
+    raw = getattr(results, "_results", results)
+    robust = raw.__class__(raw.model, raw.params, normalized_cov_params=raw.normalized_cov_params, scale=raw.scale)
+    robust.cov_params_default = cov
+    robust.cov_type = "HAC"
+    robust.use_t = True
+    robust.cov_kwds = {
+        "maxlags": maxlags,
+        "kernel": kernel,
+        "use_correction": use_correction,
+        "use_t": True,
+        "description": f"Standard Errors are heteroscedasticity and autocorrelation robust (HAC) "
+                       f"using {maxlags if maxlags is not None else 'automatic'} lags and "
+                       f"{'with' if use_correction else 'without'} small sample correction",
+    }
+    return RegressionResultsWrapper(robust)
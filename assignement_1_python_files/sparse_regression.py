@@ -0,0 +1,318 @@
+import warnings
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, lsqr
+
+
+class DesignMatrix:
+    """
+    Designmatrix aus einem dichten Block (numerische Spalten und Lags, ndarray) und
+    einem dünnbesetzten Block (0/1-Spalten, CSR), Spalten in dieser Reihenfolge.
+    Dichte Spalten als CSR zu speichern kostet 12 statt 8 Byte je Eintrag.
+    """
+
+    def __init__(self, dense, sparse):
+        """
+        :param dense: Array (n_obs, n_dense)
+        :param sparse: dünnbesetzte Matrix (n_obs, n_sparse)
+        """
+        self.dense = np.asfortranarray(dense, dtype=float)  # spaltenweise für den Koordinatenabstieg
+        self.sparse = sp.csr_matrix(sparse, dtype=float)
+        self.n_dense = self.dense.shape[1]
+        self.shape = (self.dense.shape[0], self.n_dense + self.sparse.shape[1])
+
+    def __matmul__(self, v):
+        """X @ v"""
+        return self.dense @ v[:self.n_dense] + self.sparse @ v[self.n_dense:]
+
+    def rmatvec(self, u):
+        """Xᵀ @ u"""
+        return np.concatenate([self.dense.T @ u, self.sparse.T @ u])
+
+    def column_means(self):
+        return np.concatenate([self.dense.mean(axis=0), np.asarray(self.sparse.mean(axis=0)).ravel()])
+
+    def column_squares(self):
+        """Quadratsummen der (unzentrierten) Spalten."""
+        sparse_sq = np.asarray(self.sparse.multiply(self.sparse).sum(axis=0)).ravel()
+        return np.concatenate([(self.dense ** 2).sum(axis=0), sparse_sq])
+
+    def toarray(self):
+        return np.column_stack([self.dense, self.sparse.toarray()])
+
+
+def _as_design(X):
+    """Wandelt eine dünnbesetzte Matrix, ein Array oder eine DesignMatrix in eine DesignMatrix um."""
+    if isinstance(X, DesignMatrix):
+        return X
+    if sp.issparse(X):
+        return DesignMatrix(np.empty((X.shape[0], 0)), X)
+    X = np.asarray(X, dtype=float)
+    return DesignMatrix(X, sp.csr_matrix((X.shape[0], 0)))
+
+
+def sparse_design(data, numeric_columns=None, categorical_columns=None, interactions=None, lags=None):
+    """
+    Baut die Designmatrix ohne pd.get_dummies.
+
+    Numerische Spalten und Lags bilden einen dichten Block, kategorische Variablen und
+    Interaktionen (z.B. Monat x Stunde) werden direkt als 0/1-Spalten eines CSR-Blocks
+    aus ihren Codes erzeugt, die erste Kategorie entfällt (drop_first).
+    Die Konstante wird nicht eingefügt, sie wird von den fit-Funktionen separat geschätzt.
+
+    :param data: DataFrame mit den Daten
+    :param numeric_columns: Liste numerischer Spalten
+    :param categorical_columns: Liste kategorischer Spalten (z.B. "Wochenstunde" mit 168 Stufen)
+    :param interactions: Liste von Spaltenpaaren, deren Kombination als Kategorie kodiert wird
+    :param lags: Dictionary Spalte -> Liste von Lags (fehlende Werte werden mit dem Mittelwert gefüllt)
+    :return: Tuple (DesignMatrix (n_obs, n_features), Liste der Spaltennamen)
+    """
+    n_obs = len(data)
+    dense = []
+    blocks = []
+    names = []
+
+    for column in numeric_columns or []:
+        dense.append(data[column].to_numpy(dtype=float))
+        names.append(column)
+
+    for column, column_lags in (lags or {}).items():
+        values = data[column]
+        dense.extend(values.shift(lag).fillna(values.mean()).to_numpy(dtype=float) for lag in column_lags)
+        names.extend(f"{column}_lag{lag}" for lag in column_lags)
+
+    categorical = [(column, data[column]) for column in categorical_columns or []]
+    for column_a, column_b in interactions or []:
+        combined = data[column_a].astype(str) + "_" + data[column_b].astype(str)
+        categorical.append((f"{column_a}_x_{column_b}", combined))
+
+    for name, values in categorical:
+        codes, levels = pd.factorize(values, sort=True)
+        # Erste Stufe als Referenz weglassen
+        keep = codes > 0
+        block = sp.csr_matrix(
+            (np.ones(keep.sum()), (np.flatnonzero(keep), codes[keep] - 1)),
+            shape=(n_obs, len(levels) - 1),
+        )
+        blocks.append(block)
+        names.extend(f"{name}_{level}" for level in levels[1:])
+
+    dense = np.column_stack(dense) if dense else np.empty((n_obs, 0))
+    sparse = sp.hstack(blocks, format="csr") if blocks else sp.csr_matrix((n_obs, 0))
+    return DesignMatrix(dense, sparse), names
+
+
+def _centered_operator(X, scale=None, damp=None):
+    """
+    Lineare Abbildung der spaltenzentrierten Matrix (X - 1 * meanᵀ) / scale, ohne sie dicht aufzubauen.
+
+    Mit damp werden unter die zentrierte Matrix die Zeilen diag(damp / scale) gehängt,
+    damit eine Ridge-Strafe auf den unskalierten Koeffizienten erhalten bleibt.
+
+    :param X: DesignMatrix, dünnbesetzte Matrix oder Array (n_obs, n_features)
+    :param scale: Skalierung je Spalte (default: keine)
+    :param damp: Wurzel der Ridge-Strafe (default: keine Zusatzzeilen)
+    :return: Tuple (LinearOperator, Spaltenmittelwerte)
+    """
+    X = _as_design(X)
+    n_obs, n_features = X.shape
+    means = X.column_means()
+    scale = np.ones(n_features) if scale is None else scale
+    n_rows = n_obs + (n_features if damp else 0)
+
+    def matvec(v):
+        v = np.ravel(v) / scale
+        u = X @ v - means @ v
+        return np.concatenate([u, damp * v]) if damp else u
+
+    def rmatvec(u):
+        u = np.ravel(u)
+        v = X.rmatvec(u[:n_obs]) - means * u[:n_obs].sum()
+        if damp:
+            v = v + damp * u[n_obs:]
+        return v / scale
+
+    return LinearOperator((n_rows, n_features), matvec=matvec, rmatvec=rmatvec, dtype=float), means
+
+
+def _centered_norms(X, means):
+    """Normen der zentrierten Spalten der DesignMatrix X (konstante Spalten erhalten 1)."""
+    col_sq = X.column_squares() - X.shape[0] * means ** 2
+    norms = np.sqrt(np.maximum(col_sq, 0.0))
+    return np.where(norms > 0, norms, 1.0)
+
+
+def _coefficients(beta, intercept, names):
+    return pd.Series(np.concatenate([[intercept], beta]), index=["const"] + list(names))
+
+
+def fit_ridge(X, y, alpha=0.0, names=None, x0=None, atol=1e-10, btol=1e-10, iter_lim=None):
+    """
+    Ridge-Regression (alpha = 0: OLS) per LSQR auf der dünnbesetzten Designmatrix.
+
+    Minimiert ||y - const - Xβ||² + alpha * ||β||², die Konstante wird nicht bestraft.
+    Die zentrierten Spalten werden für LSQR auf Norm 1 skaliert (Diagonal-Präkonditionierung),
+    sonst konvergiert LSQR bei Dummies neben Lags in MWh bzw. EUR kaum. β wird danach
+    zurückskaliert.
+
+    :param X: Designmatrix (aus sparse_design, dünnbesetzte Matrix oder Array)
+    :param y: abhängige Variable
+    :param alpha: Regularisierungsstärke
+    :param names: Spaltennamen (default: x0, x1, ...)
+    :param x0: Startwert für β (Warmstart)
+    :param atol: Toleranz für LSQR
+    :param btol: Toleranz für LSQR
+    :param iter_lim: maximale Anzahl Iterationen für LSQR (default: 10 * n_features)
+    :return: Series mit den Koeffizienten (inkl. "const")
+    """
+    X = _as_design(X)
+    y = np.asarray(y, dtype=float)
+    n_features = X.shape[1]
+    names = names if names is not None else [f"x{i}" for i in range(n_features)]
+    means = X.column_means()
+    scale = _centered_norms(X, means)
+    damp = np.sqrt(alpha)
+    operator, _ = _centered_operator(X, scale=scale, damp=damp)
+    y_mean = y.mean()
+
+    rhs = y - y_mean
+    if damp:
+        rhs = np.concatenate([rhs, np.zeros(n_features)])
+    start = None if x0 is None else np.asarray(x0, dtype=float) * scale
+    result = lsqr(operator, rhs, atol=atol, btol=btol, iter_lim=iter_lim or 10 * n_features, x0=start)
+    istop, n_iter = result[1], result[2]
+    if istop == 7:
+        warnings.warn(f"LSQR hat das Iterationslimit ({n_iter}) erreicht, die Koeffizienten sind nicht konvergiert.",
+                      RuntimeWarning)
+    elif istop in (3, 6):
+        warnings.warn(f"LSQR abgebrochen (istop={istop}): Designmatrix schlecht konditioniert.", RuntimeWarning)
+
+    beta = result[0] / scale
+    intercept = y_mean - means @ beta
+    return _coefficients(beta, intercept, names)
+
+
+def fit_ols(X, y, names=None, **kwargs):
+    """
+    OLS per LSQR, ohne die Designmatrix dicht aufzubauen.
+
+    :param X: Designmatrix (aus sparse_design, dünnbesetzte Matrix oder Array)
+    :param y: abhängige Variable
+    :param names: Spaltennamen
+    :return: Series mit den Koeffizienten (inkl. "const")
+    """
+    return fit_ridge(X, y, alpha=0.0, names=names, **kwargs)
+
+
+def fit_lasso(X, y, alpha, names=None, beta_init=None, max_iter=1000, tol=1e-6):
+    """
+    Lasso-Regression per Koordinatenabstieg.
+
+    Minimiert 1 / (2n) * ||y - const - Xβ||² + alpha * ||β||₁ (wie sklearn). Die
+    Spaltenzentrierung erfolgt implizit, sodass der 0/1-Block dünnbesetzt bleibt;
+    seine Spalten werden im CSC-Format durchlaufen, die des dichten Blocks direkt.
+
+    :param X: Designmatrix (aus sparse_design, dünnbesetzte Matrix oder Array)
+    :param y: abhängige Variable
+    :param alpha: Regularisierungsstärke
+    :param names: Spaltennamen
+    :param beta_init: Startwert für β (Warmstart)
+    :param max_iter: maximale Anzahl Durchläufe über alle Spalten
+    :param tol: Abbruch, wenn sich kein Koeffizient stärker als tol ändert
+    :return: Series mit den Koeffizienten (inkl. "const")
+    """
+    X = _as_design(X)
+    sparse = sp.csc_matrix(X.sparse)
+    y = np.asarray(y, dtype=float)
+    n_obs, n_features = X.shape
+    names = names if names is not None else [f"x{i}" for i in range(n_features)]
+
+    means = X.column_means()
+    col_sq = X.column_squares() - n_obs * means ** 2
+    y_mean = y.mean()
+    all_rows = slice(None)
+
+    beta = np.zeros(n_features) if beta_init is None else np.array(beta_init, dtype=float)
+    # Residuum der zentrierten Daten r = (y - ȳ) - (X - mean) β, gespeichert als
+    # resid + offset, damit ein Update nur die Nicht-Null-Einträge der Spalte berührt
+    resid = (y - y_mean) - X @ beta
+    offset = means @ beta
+
+    converged = False
+    for _ in range(max_iter):
+        max_change = 0.0
+        for j in range(n_features):
+            if col_sq[j] <= 0:
+                continue
+            if j < X.n_dense:
+                rows, values = all_rows, X.dense[:, j]
+            else:
+                start, stop = sparse.indptr[j - X.n_dense], sparse.indptr[j - X.n_dense + 1]
+                rows, values = sparse.indices[start:stop], sparse.data[start:stop]
+
+            # Gradient der zentrierten Spalte: (X_j - m_j)ᵀ r, wobei sum(r) = 0
+            rho = values @ (resid[rows] + offset) + col_sq[j] * beta[j]
+            new = np.sign(rho) * max(abs(rho) - n_obs * alpha, 0.0) / col_sq[j]
+
+            change = new - beta[j]
+            if change != 0.0:
+                resid[rows] -= values * change
+                offset += means[j] * change
+                beta[j] = new
+                max_change = max(max_change, abs(change))
+
+        if max_change < tol:
+            converged = True
+            break
+
+    if not converged:
+        warnings.warn(f"Koordinatenabstieg hat max_iter ({max_iter}) erreicht, die Koeffizienten sind nicht "
+                      f"konvergiert (größte Änderung {max_change:.2e} > tol={tol:.0e}).", RuntimeWarning)
+
+    intercept = y_mean - means @ beta
+    return _coefficients(beta, intercept, names)
+
+
+def regularization_path(X, y, method="lasso", alphas=None, n_alphas=20, eps=1e-3, names=None, **kwargs):
+    """
+    Regularisierungspfad mit Warmstart von großen zu kleinen alpha.
+
+    :param X: Designmatrix (aus sparse_design, dünnbesetzte Matrix oder Array)
+    :param y: abhängige Variable
+    :param method: "lasso" oder "ridge"
+    :param alphas: Liste der alpha-Werte (default: logarithmisch von alpha_max bis eps * alpha_max)
+    :param n_alphas: Anzahl der alpha-Werte, falls alphas nicht angegeben
+    :param eps: Verhältnis kleinstes zu größtem alpha
+    :param names: Spaltennamen
+    :param kwargs: weitere Argumente für fit_lasso bzw. fit_ridge
+    :return: DataFrame mit den Koeffizienten (Spalten = alpha)
+    """
+    X = _as_design(X)
+    y = np.asarray(y, dtype=float)
+    n_obs = X.shape[0]
+
+    if alphas is None:
+        operator, means = _centered_operator(X)
+        if method == "ridge":
+            # Mittlere Quadratsumme der zentrierten Spalten als Maßstab
+            alpha_max = (X.column_squares() - n_obs * means ** 2).mean()
+        else:
+            # Kleinstes alpha, bei dem alle Lasso-Koeffizienten null sind
+            alpha_max = np.abs(operator.rmatvec(y - y.mean())).max() / n_obs
+        alphas = alpha_max * np.logspace(0, np.log10(eps), n_alphas)
+    alphas = sorted(alphas, reverse=True)
+
+    path = {}
+    beta = None
+    for alpha in alphas:
+        if method == "lasso":
+            coef = fit_lasso(X, y, alpha, names=names, beta_init=beta, **kwargs)
+        elif method == "ridge":
+            coef = fit_ridge(X, y, alpha=alpha, names=names, x0=beta, **kwargs)
+        else:
+            raise ValueError(f"Unbekannte Methode '{method}', erlaubt sind 'lasso' und 'ridge'.")
+        beta = coef.to_numpy()[1:]
+        path[alpha] = coef
+
+    return pd.DataFrame(path)
@@ -3,51 +3,19 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import statsmodels.api as sm
 from statsmodels.stats.outliers_influence import variance_inflation_factor
-# Daten laden
-load_data = pd.read_excel("data_assignement_1/hourly_load_profile_electricity_AT_2023.xlsx")
-price_data = pd.read_csv("data_assignement_1/preise2023.csv", sep=";")
+from project_models import load_strompreis_data, fit_strompreis_models
+from model_diagnostics import coefficient_table, diagnostics_table
+# Daten laden (Last, Preis, Kalendervariablen) und Modelle schätzen, siehe project_models.py
+load_data = load_strompreis_data()
+diagnostics_models = fit_strompreis_models(load_data)
 
-# Zeitvariablen extrahieren
-load_data['DateUTC'] = pd.to_datetime(load_data['DateUTC'])
-load_data['Stunde'] = load_data['DateUTC'].dt.hour
-load_data['Wochentag'] = load_data['DateUTC'].dt.weekday
-load_data['Monat'] = load_data['DateUTC'].dt.month
-load_data.rename(columns={'Value': 'Last'}, inplace=True)
-load_data['Preis'] = price_data['AT'].astype(float)
+# Modell ohne das oberste und unterste 1% der Preise
+print(coefficient_table(diagnostics_models["Strompreis Modell 1 (ohne Extremwerte)"]))
 
-
-
-# Annahme: Ihr DataFrame heißt 'load_data'
-df = load_data[['Stunde', 'Wochentag', 'Monat', 'Last', 'Preis']].copy()
-
-# Berechne die Schwellenwerte
-upper_threshold = df['Preis'].quantile(0.99)  # Oberstes 1%
-lower_threshold = df['Preis'].quantile(0.01)  # Unterstes 1%
-
-# Filtere die extremen Werte
-highest_1p = df[df['Preis'] >= upper_threshold]  # Höchste 1%
-lowest_1p = df[df['Preis'] <= lower_threshold]   # Niedrigste 1%
-
-# Optional: Erstelle einen DataFrame ohne die Extremwerte
-df_filtered = df[(df['Preis'] > lower_threshold) & (df['Preis'] < upper_threshold)]
-
-# 2. Lineare Regression (wie im ursprünglichen Modell)
-X = sm.add_constant(df_filtered[['Stunde', 'Wochentag', 'Monat', 'Last']])
-y = df_filtered['Preis']
-model = sm.OLS(y, X).fit()
-
-# 3. Ergebnisse anzeigen
-print(model.summary())
-
-
-
-
-# Modell-Daten
+# Modell mit allen Daten
 df = load_data[['Stunde', 'Wochentag', 'Monat', 'Last', 'Preis']]
-X = sm.add_constant(df[['Stunde', 'Wochentag', 'Monat', 'Last']])
-y = df['Preis']
-model = sm.OLS(y, X).fit()
-print(model.summary())
+model = diagnostics_models["Strompreis Modell 1"]
+print(coefficient_table(model))
 
 # Residuen-Plot
 residuals = model.resid
@@ -81,4 +49,8 @@ plt.axhline(y=0, color='r', linestyle='--')
 plt.xlabel('Angepasste Strompreise [€/MWh] (Strompreis Modell 1)')
 plt.ylabel('Residuen des Strompreises [€/MWh]')
 plt.title('Residuen vs. Angepasste Werte')
-plt.savefig("D:/Energiemodelle und Analysen/energymodels-and-analysis-homework-1/plots/residuen_vs_vorhersagen_Strom_modell1.png")
\ No newline at end of file
+plt.savefig("D:/Energiemodelle und Analysen/energymodels-and-analysis-homework-1/plots/residuen_vs_vorhersagen_Strom_modell1.png")
+
+
+# Vergleichstabelle der Modelle (gemeinsame Tabelle aller Skripte: diagnostics_report.py)
+print(diagnostics_table(diagnostics_models))
@@ -0,0 +1,413 @@
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from concurrent.futures import ProcessPoolExecutor
+from heat_parameters import DEFAULT_PARAMS, VARIABLES
+
+# Flottenmodus für Heat_Model.py: viele Gebäude mit gemeinsamer Netzbezugsgrenze.
+# Jedes Gebäude entspricht dem Modell aus Heat_Model.py (Wärmepumpe, PV, Speicher,
+# Fernwärme). Die Gebäude sind nur über die gemeinsame Grenze für E_Netz_WP gekoppelt.
+
+# Reihenfolge der Variablen je Gebäude (jeweils n_hours Einträge), Defaults wie in Heat_Model.py
+VAR_INDEX = {name: i for i, name in enumerate(VARIABLES)}
+
+
+def chunk_params(fleet_params, start, stop, n_hours):
+    """
+    Extrahiert die Parameter eines Blocks von Gebäuden aus den Flotten-Arrays.
+
+    Skalare gelten für alle Gebäude, 1D-Arrays (n_buildings) je Gebäude,
+    2D-Arrays (n_buildings, n_hours) je Gebäude und Stunde. Für C_el, C_PV
+    ist zusätzlich ein 1D-Array der Länge n_hours als gemeinsames Profil erlaubt.
+    Memory-gemappte Arrays werden dabei nur im Bereich start:stop gelesen.
+
+    :param fleet_params: Dictionary mit den Parameter-Arrays der Flotte
+    :param start: Index des ersten Gebäudes
+    :param stop: Index nach dem letzten Gebäude
+    :param n_hours: Anzahl der Stunden
+    :return: Dictionary mit Arrays (n) für skalare und (n, n_hours) für stündliche Parameter
+    """
+    n = stop - start
+    params = {}
+    for name, default in DEFAULT_PARAMS.items():
+        value = np.asarray(fleet_params.get(name, default), dtype=float)
+        hourly = name in ("C_el", "C_PV")
+        if value.ndim == 2:
+            value = np.asarray(value[start:stop])
+        elif value.ndim == 1 and hourly and value.shape[0] == n_hours:
+            value = np.broadcast_to(value, (n, n_hours))
+        elif value.ndim == 1:
+            value = np.asarray(value[start:stop])
+        else:
+            value = np.full(n, float(value))
+        if hourly and value.ndim == 1:
+            value = np.broadcast_to(value[:, None], (n, n_hours))
+        params[name] = value
+
+    params["d"] = np.asarray(fleet_params["d"][start:stop], dtype=float)
+    return params
+
+
+def building_params(fleet_params, b, n_hours):
+    """
+    Extrahiert die Parameter eines Gebäudes aus den Flotten-Arrays (siehe chunk_params).
+
+    :param fleet_params: Dictionary mit den Parameter-Arrays der Flotte
+    :param b: Index des Gebäudes
+    :param n_hours: Anzahl der Stunden
+    :return: Dictionary mit den Parametern des Gebäudes
+    """
+    return {name: value[0] for name, value in chunk_params(fleet_params, b, b + 1, n_hours).items()}
+
+
+def building_block(params, n_hours):
+    """
+    Erzeugt die Nebenbedingungen eines Gebäudes als dünnbesetzte Matrizen.
+
+    :param params: Parameter eines Gebäudes (siehe building_params)
+    :param n_hours: Anzahl der Stunden
+    :return: Tuple (c, A_ub, b_ub, A_eq, b_eq, bounds)
+    """
+    T = n_hours
+    n_vars = len(VARIABLES) * T
+    hours = np.arange(T)
+
+    def col(name, t=hours):
+        return VAR_INDEX[name] * T + t
+
+    # Zielfunktion
+    c = np.zeros(n_vars)
+    c[col("E_Netz_WP")] = np.broadcast_to(params["C_el"], (T,))
+    c[col("W_FW")] = params["C_FW"]
+    c[col("E_PV_Netz")] = np.broadcast_to(params["C_PV"], (T,))
+
+    # Ungleichungen: Wärmebedarf (-W_FW - W_WP <= -d) und PV-Aufteilung (<= Q_PV_max)
+    rows = np.concatenate([hours, hours, T + hours, T + hours, T + hours])
+    cols = np.concatenate([col("W_FW"), col("W_WP"), col("E_PV_WP"), col("E_PV_sto"), col("E_PV_Netz")])
+    vals = np.concatenate([-np.ones(2 * T), np.ones(3 * T)])
+    A_ub = sp.csr_matrix((vals, (rows, cols)), shape=(2 * T, n_vars))
+    b_ub = np.concatenate([-params["d"], np.full(T, params["Q_PV_max"])])
+
+    # Gleichungen: Wärmepumpe (W_WP - eta * E_in = 0) und Speicherbilanz
+    eta = params["eta"]
+    wp_rows = np.concatenate([hours] * 4)
+    wp_cols = np.concatenate([col("W_WP"), col("E_PV_WP"), col("E_sto_WP"), col("E_Netz_WP")])
+    wp_vals = np.concatenate([np.ones(T), np.full(3 * T, -eta)])
+
+    sto_rows = np.concatenate([T + hours, T + hours, T + hours, T + hours[1:]])
+    sto_cols = np.concatenate([col("E_sto"), col("E_PV_sto"), col("E_sto_WP"), col("E_sto", hours[:-1])])
+    sto_vals = np.concatenate([np.ones(T), -np.ones(T), np.ones(T), -np.ones(T - 1)])
+
+    A_eq = sp.csr_matrix(
+        (np.concatenate([wp_vals, sto_vals]), (np.concatenate([wp_rows, sto_rows]), np.concatenate([wp_cols, sto_cols]))),
+        shape=(2 * T, n_vars),
+    )
+    b_eq = np.zeros(2 * T)
+    b_eq[T] = params["E_sto_init"]
+
+    # Kapazitätsgrenzen als Variablenschranken
+    upper = np.full(n_vars, np.inf)
+    upper[col("W_WP")] = params["Q_WP_max"]
+    upper[col("W_FW")] = params["Q_FW_max"]
+    upper[col("E_sto")] = params["Q_sto_max"]
+    bounds = np.column_stack([np.zeros(n_vars), upper])
+
+    return c, A_ub, b_ub, A_eq, b_eq, bounds
+
+
+def build_fleet_lp(fleet_params, grid_limit):
+    """
+    Baut das gesamte Flotten-LP mit blockdiagonaler Struktur und gemeinsamer
+    Netzbezugsgrenze (Summe E_Netz_WP über alle Gebäude <= grid_limit je Stunde).
+
+    :param fleet_params: Dictionary mit Parameter-Arrays, "d" hat Form (n_buildings, n_hours)
+    :param grid_limit: Netzbezugsgrenze je Stunde (Skalar oder Array der Länge n_hours)
+    :return: Tuple (c, A_ub, b_ub, A_eq, b_eq, bounds)
+    """
+    n_buildings, n_hours = np.shape(fleet_params["d"])
+    blocks = [building_block(building_params(fleet_params, b, n_hours), n_hours) for b in range(n_buildings)]
+
+    c = np.concatenate([block[0] for block in blocks])
+    A_ub = sp.block_diag([block[1] for block in blocks], format="csr")
+    b_ub = np.concatenate([block[2] for block in blocks])
+    A_eq = sp.block_diag([block[3] for block in blocks], format="csr")
+    b_eq = np.concatenate([block[4] for block in blocks])
+    bounds = np.vstack([block[5] for block in blocks])
+
+    # Kopplung: eine Zeile je Stunde über alle Gebäude
+    n_vars = len(VARIABLES) * n_hours
+    cols = (np.arange(n_buildings)[:, None] * n_vars + VAR_INDEX["E_Netz_WP"] * n_hours + np.arange(n_hours)).ravel()
+    rows = np.tile(np.arange(n_hours), n_buildings)
+    coupling = sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(n_hours, n_buildings * n_vars))
+
+    A_ub = sp.vstack([A_ub, coupling], format="csr")
+    b_ub = np.concatenate([b_ub, np.broadcast_to(np.asarray(grid_limit, dtype=float), (n_hours,))])
+
+    return c, A_ub, b_ub, A_eq, b_eq, bounds
+
+
+def solve_fleet(fleet_params, grid_limit):
+    """
+    Löst das Flotten-LP direkt (für kleine Flotten oder zur Kontrolle der Dekomposition).
+
+    :param fleet_params: Dictionary mit Parameter-Arrays
+    :param grid_limit: Netzbezugsgrenze je Stunde
+    :return: Tuple (Dictionary Variable -> Array (n_buildings, n_hours), Zielfunktionswert)
+    """
+    n_buildings, n_hours = np.shape(fleet_params["d"])
+    c, A_ub, b_ub, A_eq, b_eq, bounds = build_fleet_lp(fleet_params, grid_limit)
+
+    result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs")
+    if not result.success:
+        raise RuntimeError(f"Flotten-LP nicht lösbar: {result.message}")
+
+    x = result.x.reshape(n_buildings, len(VARIABLES), n_hours)
+    solution = {name: x[:, i, :] for i, name in enumerate(VARIABLES)}
+    return solution, result.fun
+
+
+# Zustand der Worker-Prozesse: Parameter und gemittelte Lösung liegen als .npy-Dateien
+# im Arbeitsverzeichnis und werden nur einmal je Prozess memory-gemappt.
+_WORKER = {}
+
+
+def _init_worker(work_dir, param_names, engine, n_levels):
+    """Öffnet die Parameter param_names und die Lösungsdatei im Worker-Prozess (Initializer)."""
+    _WORKER["params"] = {name: np.load(os.path.join(work_dir, f"param_{name}.npy"), mmap_mode="r") for name in param_names}
+    _WORKER["solution"] = np.load(os.path.join(work_dir, "solution.npy"), mmap_mode="r+")
+    _WORKER["engine"] = engine
+    _WORKER["n_levels"] = n_levels
+
+
+def _original_cost(x, params):
+    """Kosten der Lösungen x (n, len(VARIABLES), n_hours) mit den Originalpreisen."""
+    return (
+        (params["C_el"] * x[:, VAR_INDEX["E_Netz_WP"]]).sum(axis=1)
+        + params["C_FW"] * x[:, VAR_INDEX["W_FW"]].sum(axis=1)
+        + (params["C_PV"] * x[:, VAR_INDEX["E_PV_Netz"]]).sum(axis=1)
+    )
+
+
+def _solve_subproblems(params, grid_price, n_hours):
+    """
+    Löst die Teilprobleme eines Blocks für gegebene Netzpreise.
+
+    :return: Tuple (Lösungen (n, len(VARIABLES), n_hours), Lagrange-Zielfunktionswerte (n))
+    """
+    if _WORKER["engine"] == "dp":
+        # Alle Gebäude des Blocks gleichzeitig als Szenarien der dynamischen Programmierung
+        from heat_dispatch import solve_dispatch, SCENARIO_PARAMS
+        solution, values = solve_dispatch(
+            params["d"], C_el=params["C_el"] + grid_price, C_PV=params["C_PV"],
+            n_levels=_WORKER["n_levels"], **{name: params[name] for name in SCENARIO_PARAMS}
+        )
+        return np.stack([solution[name] for name in VARIABLES], axis=1), values
+
+    x = np.empty((len(params["d"]), len(VARIABLES), n_hours))
+    values = np.empty(len(params["d"]))
+    for i in range(len(params["d"])):
+        c, A_ub, b_ub, A_eq, b_eq, bounds = building_block({name: value[i] for name, value in params.items()}, n_hours)
+
+        # Lagrange-Multiplikator der Kopplung wirkt als Aufschlag auf den Netzbezug
+        c[VAR_INDEX["E_Netz_WP"] * n_hours:(VAR_INDEX["E_Netz_WP"] + 1) * n_hours] += grid_price
+
+        result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs")
+        if not result.success:
+            raise RuntimeError(f"Teilproblem für ein Gebäude nicht lösbar: {result.message}")
+        x[i] = result.x.reshape(len(VARIABLES), n_hours)
+        values[i] = result.fun
+    return x, values
+
+
+def _solve_chunk(args):
+    """
+    Löst einen Block von Gebäuden (Worker) und aktualisiert dessen gemittelte Lösung.
+
+    :return: Tuple (Netzbezug je Stunde aktuell, Netzbezug je Stunde gemittelt,
+             Summe der Lagrange-Werte, Kosten der gemittelten Lösung)
+    """
+    start, stop, grid_price, k = args
+    solution = _WORKER["solution"]
+    n_hours = solution.shape[2]
+    params = chunk_params(_WORKER["params"], start, stop, n_hours)
+
+    x, values = _solve_subproblems(params, grid_price, n_hours)
+
+    # Ergodisches Mittel der Iterationen als primale Lösung
+    x_avg = solution[start:stop].astype(float)
+    x_avg += (x - x_avg) / k
+    solution[start:stop] = x_avg
+    solution.flush()
+
+    netz = VAR_INDEX["E_Netz_WP"]
+    return x[:, netz].sum(axis=0), x_avg[:, netz].sum(axis=0), values.sum(), _original_cost(x_avg, params).sum()
+
+
+def _repair_chunk(args):
+    """
+    Reduziert den Netzbezug der gemittelten Lösung stundenweise um den Faktor scale
+    und ersetzt die fehlende Wärme durch Fernwärme (bis Q_FW_max).
+
+    :return: Tuple (Netzbezug je Stunde, nicht gedeckte Wärme, Kosten der reparierten Lösung)
+    """
+    start, stop, scale = args
+    solution = _WORKER["solution"]
+    n_hours = solution.shape[2]
+    params = chunk_params(_WORKER["params"], start, stop, n_hours)
+
+    x = solution[start:stop].astype(float)
+    netz, w_wp, w_fw = VAR_INDEX["E_Netz_WP"], VAR_INDEX["W_WP"], VAR_INDEX["W_FW"]
+
+    lost_heat = params["eta"][:, None] * (1 - scale) * x[:, netz]
+    x[:, netz] *= scale
+    x[:, w_wp] -= lost_heat
+    fw_room = np.maximum(params["Q_FW_max"][:, None] - x[:, w_fw], 0.0)
+    x[:, w_fw] += np.minimum(lost_heat, fw_room)
+    unmet = np.maximum(lost_heat - fw_room, 0.0)
+
+    solution[start:stop] = x
+    solution.flush()
+    return x[:, netz].sum(axis=0), unmet.sum(), _original_cost(x, params).sum()
+
+
+def solve_fleet_decomposed(fleet_params, grid_limit, max_iter=50, step=1.0, tol=1e-3, gap_tol=1e-2,
+                           engine="highs", n_levels=51, n_workers=None, chunk_size=100, work_dir=None):
+    """
+    Löst das Flotten-LP per Lagrange-Dekomposition (projiziertes Subgradientenverfahren).
+
+    Die gemeinsame Netzbezugsgrenze wird über stündliche Multiplikatoren (Netzpreise)
+    relaxiert. Die Gebäude-Teilprobleme sind dann unabhängig und werden blockweise
+    parallel gelöst. Die Schrittweite folgt Polyak aus der Lücke zwischen primalem
+    Wert und dualer Schranke, sodass sie unabhängig von Preis- und Energieeinheiten ist.
+
+    Parameter und gemittelte Lösung liegen als .npy-Dateien in work_dir, jeder Worker
+    liest nur seine Gebäude. An den Hauptprozess gehen je Block nur stündliche Summen
+    des Netzbezugs und Zielfunktionswerte. Am Ende wird die gemittelte Lösung durch
+    Kürzen des Netzbezugs (Ersatz durch Fernwärme) zulässig gemacht.
+
+    :param fleet_params: Dictionary mit Parameter-Arrays, "d" hat Form (n_buildings, n_hours)
+    :param grid_limit: Netzbezugsgrenze je Stunde (Skalar oder Array der Länge n_hours)
+    :param max_iter: Maximale Anzahl an Iterationen
+    :param step: Polyak-Faktor der Schrittweite (0 < step <= 2), wird bei Stillstand halbiert
+    :param tol: Toleranz für die Verletzung der Netzbezugsgrenze bzw. ungedeckte Wärme
+    :param gap_tol: Relative Toleranz für die Lücke zwischen Zielfunktionswert und dualer Schranke
+    :param engine: "highs" (exaktes LP je Gebäude) oder "dp" (heat_dispatch, alle Gebäude eines
+                   Blocks gleichzeitig; schneller, aber diskretisiert und damit keine exakte Schranke)
+    :param n_levels: Anzahl der Speicherstufen für engine="dp"
+    :param n_workers: Anzahl paralleler Prozesse (default: alle Kerne)
+    :param chunk_size: Anzahl Gebäude je Arbeitspaket
+    :param work_dir: Verzeichnis für Parameter und Lösung. Wird es übergeben, bleibt die Lösung dort als
+                     solution.npy liegen und der Aufrufer ist für das Aufräumen zuständig (bei großen Flotten
+                     sinnvoll, 10.000 Gebäude x 8760 h sind rund 2,8 GB). Ohne work_dir wird ein temporäres
+                     Verzeichnis verwendet, die Lösung in den Speicher geladen und das Verzeichnis gelöscht.
+    :return: Dictionary mit "solution" (Array (n_buildings, len(VARIABLES), n_hours), memory-gemappt falls
+             work_dir übergeben), "objective", "dual_bound", "gap", "grid_price", "violation" (nach der
+             Reparatur), "unmet_heat", "iterations", "work_dir"
+    """
+    if engine not in ("highs", "dp"):
+        raise ValueError(f"Unbekannte engine '{engine}', erlaubt sind 'highs' und 'dp'.")
+    if max_iter < 1:
+        raise ValueError(f"max_iter muss mindestens 1 sein, erhalten: {max_iter}.")
+
+    n_buildings, n_hours = np.shape(fleet_params["d"])
+    grid_limit = np.broadcast_to(np.asarray(grid_limit, dtype=float), (n_hours,))
+    chunks = [(start, min(start + chunk_size, n_buildings)) for start in range(0, n_buildings, chunk_size)]
+
+    # Parameter einmalig auf die Platte schreiben, Worker mappen nur die übergebenen Namen
+    temporary = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix="heat_fleet_") if temporary else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    param_names = list(fleet_params)
+    for name in param_names:
+        np.save(os.path.join(work_dir, f"param_{name}.npy"), np.asarray(fleet_params[name], dtype=float))
+    np.lib.format.open_memmap(
+        os.path.join(work_dir, "solution.npy"), mode="w+", dtype=np.float32,
+        shape=(n_buildings, len(VARIABLES), n_hours),
+    ).flush()
+
+    grid_price = np.zeros(n_hours)
+    best_bound = -np.inf
+    stalled = 0
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(work_dir, param_names, engine, n_levels)) as executor:
+        for k in range(1, max_iter + 1):
+            jobs = [(start, stop, grid_price, k) for start, stop in chunks]
+            netz_current = np.zeros(n_hours)
+            netz_avg = np.zeros(n_hours)
+            lagrangian = 0.0
+            avg_cost = 0.0
+            for current, averaged, value, cost in executor.map(_solve_chunk, jobs):
+                netz_current += current
+                netz_avg += averaged
+                lagrangian += value
+                avg_cost += cost
+
+            # Dualer Wert: Summe der Teilprobleme abzüglich Preis * Grenze
+            dual_value = lagrangian - grid_price @ grid_limit
+            if dual_value > best_bound + 1e-12 * max(abs(dual_value), 1.0):
+                best_bound = dual_value
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= 5:
+                    step, stalled = step / 2, 0
+
+            violation = max(0.0, (netz_avg - grid_limit).max())
+            gap = (avg_cost - best_bound) / max(abs(avg_cost), 1.0)
+            if violation <= tol and gap <= gap_tol:
+                break
+
+            # Projizierter Subgradient: keine Bewegung bei Preis 0 und nicht bindender Grenze
+            subgradient = netz_current - grid_limit
+            subgradient[(grid_price <= 0) & (subgradient < 0)] = 0.0
+            norm = subgradient @ subgradient
+            if norm <= tol ** 2:
+                break
+
+            # Polyak-Schritt zum Zielwert (gemittelte Lösung, mindestens knapp über dem dualen Wert)
+            target = max(avg_cost, dual_value + gap_tol * max(abs(dual_value), 1.0))
+            grid_price = np.maximum(0.0, grid_price + step * (target - dual_value) / norm * subgradient)
+
+        # Reparatur: stündlich gleichmäßiges Kürzen des Netzbezugs auf die Grenze
+        scale = np.where(netz_avg > grid_limit, grid_limit / np.maximum(netz_avg, 1e-12), 1.0)
+        netz_repaired = np.zeros(n_hours)
+        unmet_heat = 0.0
+        objective = 0.0
+        for netz, unmet, cost in executor.map(_repair_chunk, [(start, stop, scale) for start, stop in chunks]):
+            netz_repaired += netz
+            unmet_heat += unmet
+            objective += cost
+
+    # Parameter-Kopien werden nicht mehr gebraucht
+    for name in param_names:
+        os.remove(os.path.join(work_dir, f"param_{name}.npy"))
+
+    violation = max(0.0, (netz_repaired - grid_limit).max())
+    gap = (objective - best_bound) / max(abs(objective), 1.0)
+    if unmet_heat > tol:
+        warnings.warn(f"Dekomposition nicht konvergiert: {unmet_heat:.3f} kWh Wärme nach der Reparatur ungedeckt.")
+    if gap > gap_tol:
+        warnings.warn(f"Dekomposition nicht konvergiert: relative Lücke zur dualen Schranke {gap:.2%}.")
+
+    solution = np.load(os.path.join(work_dir, "solution.npy"), mmap_mode="r")
+    if temporary:
+        solution = np.array(solution)
+        shutil.rmtree(work_dir)
+        work_dir = None
+
+    return {
+        "solution": solution,
+        "objective": objective,
+        "dual_bound": best_bound,
+        "gap": gap,
+        "grid_price": grid_price,
+        "violation": violation,
+        "unmet_heat": unmet_heat,
+        "iterations": k,
+        "work_dir": work_dir,
+    }
@@ -0,0 +1,17 @@
+# Gemeinsame Definitionen für Heat_Model.py, heat_dispatch.py und heat_fleet.py
+
+# Default-Werte der skalaren Parameter (C_el und C_PV gelten für jede Stunde)
+DEFAULT_PARAMS = {
+    "eta": 3.5,
+    "C_el": 0.3,
+    "C_FW": 0.1,
+    "C_PV": -0.05,
+    "Q_PV_max": 5.0,
+    "Q_sto_max": 10.0,
+    "Q_WP_max": 6.0,
+    "Q_FW_max": 10.0,
+    "E_sto_init": 5.0,
+}
+
+# Entscheidungsvariablen je Stunde, in dieser Reihenfolge auch in den Arrays der Solver
+VARIABLES = ["E_PV_sto", "E_PV_WP", "E_PV_Netz", "E_sto_WP", "E_Netz_WP", "E_sto", "W_FW", "W_WP"]
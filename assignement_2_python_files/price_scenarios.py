@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.signal import lfilter
+
+# Szenariogenerator für stündliche Strompreise aus dem Preismodell in price_model.py:
+# Strompreis_t = const + b_N * Nachfrage_t + b_T * Temperatur_t + b_lag * Strompreis_{t-1} + e_t
+# Die Pfade werden als .npy-Datei (float32, Form (n_paths, n_hours)) geschrieben und
+# können direkt als C_el an heat_dispatch.solve_dispatch übergeben werden.
+
+
+def simulate_price_paths(params, nachfrage, temperatur, residuals=None, n_paths=1000, initial_price=None,
+                         method="bootstrap", block_length=24, sigma=None, seed=None):
+    """
+    Simuliert stündliche Preispfade über die AR(1)-Rekursion des Preismodells.
+
+    Die Rekursion läuft für alle Pfade gleichzeitig als linearer Filter (lfilter).
+
+    :param params: Koeffizienten mit den Schlüsseln "const", "Nachfrage", "Temperatur", "Strompreis_lag1"
+                   (z.B. results.params aus price_model.py)
+    :param nachfrage: Nachfrage je Stunde (Array der Länge n_hours)
+    :param temperatur: Temperatur je Stunde (Array der Länge n_hours)
+    :param residuals: Residuen des Modells (results.resid), nötig für "bootstrap"
+    :param n_paths: Anzahl der Pfade
+    :param initial_price: Preis der Stunde vor dem ersten simulierten Wert (default: stationärer Mittelwert)
+    :param method: "bootstrap" (Blöcke von Residuen ziehen) oder "normal" (N(0, sigma²))
+    :param block_length: Blocklänge in Stunden beim Bootstrap (erhält die Tagesstruktur der Residuen)
+    :param sigma: Standardabweichung der Residuen für "normal", falls keine Residuen übergeben werden
+                  (z.B. np.sqrt(results.scale))
+    :param seed: Seed für den Zufallsgenerator
+    :return: Array (n_paths, n_hours) mit Preisen in €/MWh
+    """
+    rng = np.random.default_rng(seed)
+    nachfrage = np.asarray(nachfrage, dtype=float)
+    temperatur = np.asarray(temperatur, dtype=float)
+    n_hours = len(nachfrage)
+
+    phi = params["Strompreis_lag1"]
+    level = params["const"] + params["Nachfrage"] * nachfrage + params["Temperatur"] * temperatur
+
+    if method == "bootstrap":
+        if residuals is None:
+            raise ValueError("Für method='bootstrap' werden die Residuen benötigt.")
+        residuals = np.asarray(residuals, dtype=float)
+        n_blocks = -(-n_hours // block_length)
+        starts = rng.integers(0, len(residuals) - block_length + 1, size=(n_paths, n_blocks))
+        index = (starts[:, :, None] + np.arange(block_length)).reshape(n_paths, -1)[:, :n_hours]
+        shocks = residuals[index]
+    elif method == "normal":
+        if residuals is not None:
+            sigma = np.std(residuals, ddof=len(params))
+        elif sigma is None:
+            raise ValueError("Für method='normal' werden die Residuen oder sigma benötigt.")
+        shocks = rng.normal(0.0, sigma, size=(n_paths, n_hours))
+    else:
+        raise ValueError(f"Unbekannte Methode '{method}', erlaubt sind 'bootstrap' und 'normal'.")
+
+    if initial_price is None:
+        initial_price = level.mean() / (1 - phi)
+
+    # p_t = phi * p_{t-1} + level_t + e_t, Startwert über den Filterzustand
+    zi = np.full((n_paths, 1), phi * initial_price)
+    paths, _ = lfilter([1.0], [1.0, -phi], level + shocks, axis=1, zi=zi)
+    return paths
+
+
+def write_price_paths(file_path, params, nachfrage, temperatur, residuals=None, n_paths=10000, chunk_size=1000,
+                      seed=None, **kwargs):
+    """
+    Erzeugt Preispfade blockweise und schreibt sie in eine .npy-Datei (float32).
+
+    Es liegen nie mehr als chunk_size Pfade gleichzeitig im Speicher.
+
+    :param file_path: Pfad der Ausgabedatei (.npy)
+    :param params: Koeffizienten des Preismodells
+    :param nachfrage: Nachfrage je Stunde
+    :param temperatur: Temperatur je Stunde
+    :param residuals: Residuen des Modells
+    :param n_paths: Gesamtzahl der Pfade
+    :param chunk_size: Anzahl der Pfade je Block
+    :param seed: Seed für den Zufallsgenerator
+    :param kwargs: weitere Argumente für simulate_price_paths
+    :return: Pfad der Ausgabedatei
+    """
+    n_hours = len(nachfrage)
+    output = np.lib.format.open_memmap(file_path, mode="w+", dtype=np.float32, shape=(n_paths, n_hours))
+
+    # Unabhängige Zufallsströme je Block (reproduzierbar bei gleichem seed und chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_paths // chunk_size))
+    for chunk_seed, start in zip(seeds, range(0, n_paths, chunk_size)):
+        stop = min(start + chunk_size, n_paths)
+        output[start:stop] = simulate_price_paths(
+            params, nachfrage, temperatur, residuals=residuals, n_paths=stop - start,
+            seed=chunk_seed, **kwargs
+        )
+
+    output.flush()
+    del output
+    return file_path
+
+
+def load_price_paths(file_path, rows=None, eur_per_kwh=True):
+    """
+    Lädt Preispfade per Memory-Mapping, gelesen werden nur die ausgewählten Pfade.
+
+    :param file_path: Pfad der .npy-Datei
+    :param rows: Auswahl der Pfade (z.B. slice(0, 100)), default: alle
+    :param eur_per_kwh: Wenn True, werden die Preise von €/MWh in €/kWh umgerechnet (Einheit von C_el)
+    :return: Array (n_paths, n_hours)
+    """
+    paths = np.load(file_path, mmap_mode="r")
+    if rows is not None:
+        paths = paths[rows]
+    if eur_per_kwh:
+        return paths / 1000
+    return paths